@@ -1,82 +1,344 @@
+import itertools
+# itertools.product pairs each checkerboard colour with each band of rows.
 import numpy as np
 # Import NumPy under the alias `np`, giving us fast, vectorized arrays.
+from observables import total_energy, magnetization
+# Whole-grid observables, used once to seed the running totals below.
+
+T_CRITICAL = 2.0 / np.log(1.0 + np.sqrt(2.0))
+# Onsager's exact critical temperature of the square lattice (J = 1, k_B = 1),
+# ≈ 2.269; near it local updates decorrelate slowly (critical slowing down).
+
+_BLOCK_SITES = 1 << 16
+# Sites per band of rows in the blocked sweep (roughly 1 MiB of
+# temporaries, sized for L2); grids up to 256×256 are swept in one band.
+
+_RAND_BATCH_DRAWS = 1 << 18
+# Random words generated per refill of the random buffer (1 MiB of uint32);
+# small grids get many sweeps' worth per call to the generator.
 
 class IsingModel:
     """
     A 2D Ising model on an L×L grid at temperature T.
-    Implements the Metropolis algorithm for Monte Carlo sampling.
+    Implements a checkerboard Metropolis algorithm for Monte Carlo sampling.
+
+    Passing an array of temperatures builds one independent replica per
+    temperature: spins gets shape (n, L, L), energy and magnetization
+    become length-n arrays, and each metropolis_step sweeps every replica
+    at once.
     """
 
-    def __init__(self, size, temperature):
+    def __init__(self, size, temperature, J=1.0, seed=None):
         """
         Constructor runs when you call IsingModel(size, temperature).
 
         Args:
             size (int): Number of rows/columns (grid is size×size).
-            temperature (float): Thermal noise level; higher T → more random flips.
+            temperature (float or array-like): Thermal noise level; higher
+                T → more random flips. A 1-D array gives one replica per entry.
+            J (float): Coupling constant; J > 0 favours aligned neighbours.
+            seed (int, SeedSequence or None): Seed for this model's random
+                generator; None draws fresh entropy from the OS.
         """
+        if size % 2:
+            raise ValueError(f"size must be even for the checkerboard sweep, got {size}")
+        # With odd L the periodic wrap would make two same-colour sites neighbours.
+
         self.L = size
         # Save the grid dimension so other methods know how many spins exist.
 
         self.T = temperature
         # Save the temperature; used in the Boltzmann acceptance test.
+        T = np.asarray(temperature, dtype=float)
+        # Array view of T: shape () for one grid, (n,) for n replicas.
+
+        self.J = J
+        # Save the coupling strength between neighbouring spins.
+
+        self.rng = np.random.default_rng(seed)
+        # Private PCG64 generator: faster than NumPy's legacy Mersenne
+        # Twister, and independent of the global np.random state.
 
-        # Create an L×L array of spins, each randomly +1 or -1:
-        self.spins = np.random.choice(
-            [-1, 1],       # possible spin values (down, up)
-            (self.L, self.L)  # shape of the grid
+        # Create an L×L array of spins (one per replica), each randomly +1 or -1.
+        # Stored as a C-ordered int8 grid (1 byte/spin): a 64×64 lattice is
+        # 4 KiB and stays in L1 cache alongside its neighbour gathers.
+        self.spins = np.where(
+            self.rng.random(T.shape + (self.L, self.L)) < 0.5,  # fair coin per site
+            np.int8(-1),                                # spin down
+            np.int8(1)                                  # spin up
         )
 
-    def _energy_change(self, i, j):
+        # Neighbour index tables with the periodic wrap baked in:
+        # up[i] is the row above i, down[i] the row below (both wrap around).
+        # The same tables serve columns (left = up, right = down), so the hot
+        # path gathers neighbours by lookup instead of shifting with modulo:
+        self.up = (np.arange(self.L) - 1) % self.L
+        self.down = (np.arange(self.L) + 1) % self.L
+
+        # For a spin s with neighbour sum nb, s·nb ∈ {-4, -2, 0, 2, 4}, so
+        # ΔE = 2·J·s·nb takes only five values. Work out ΔE and its Boltzmann
+        # factor exp(−ΔE / T) for all of them here, once, so the sweep never
+        # calls exp per site (only the threshold table below is kept):
+        sn = np.arange(-4, 5)
+        delta_E = 2 * self.J * sn
+        boltz = np.exp(-np.maximum(delta_E, 0) / T[..., np.newaxis])
+
+        # Quantize the acceptance probability min(1, exp(−ΔE / T)) to a
+        # uint32 threshold: a random 32-bit word u accepts iff u ≤ threshold,
+        # which happens with probability (threshold + 1) / 2³². ΔE ≤ 0 maps
+        # to 2³² − 1 (always accept), so one integer compare decides a flip.
+        # Stored flat; the sweep indexes it by s·nb + 4 plus the replica's
+        # row offset (odd slots unused):
+        self._threshold = np.clip(
+            np.ceil(boltz * 2.0**32) - 1, 0, 2**32 - 1
+        ).astype(np.uint32).ravel()
+
+        # Each replica owns nine consecutive table slots; this offset (with
+        # the +4 shift folded in) turns s·nb into an index for its own row:
+        self._table_offset = 9 * np.arange(T.size).reshape(T.shape + (1, 1)) + 4
+
+        # Buffer of pre-generated random words, one grid-shaped slab per
+        # sweep, refilled in batches by _next_random_words (empty until the
+        # first sweep):
+        self._sweeps_per_batch = max(1, _RAND_BATCH_DRAWS // self.spins.size)
+        self._rand_buf = np.empty((0,) + self.spins.shape, dtype=np.uint32)
+        self._rand_next = 0
+
+        # Running totals, computed once here and then updated flip by flip
+        # in metropolis_step so samplers never re-scan the whole grid:
+        self.energy = total_energy(self)
+        self.magnetization = magnetization(self)
+
+        # Checkerboard colouring: site (i, j) is "black" if i + j is even,
+        # "red" otherwise. Every neighbour of a black site is red and vice
+        # versa, so all sites of one colour can be updated at the same time:
+        rows, cols = np.indices((self.L, self.L))
+        self._colors = [(rows + cols) % 2 == c for c in (0, 1)]
+
+        # Cache blocking: on large grids each half-sweep walks the lattice
+        # in bands of whole rows, so the band's temporaries (field, table
+        # indices, thresholds, accept mask) stay in cache instead of
+        # streaming full-grid arrays through memory. Same-colour sites are
+        # independent, so the band order doesn't matter:
+        band_rows = max(1, _BLOCK_SITES // self.spins[..., 0, :].size)
+        self._bands = [
+            slice(r, r + band_rows) for r in range(0, self.L, band_rows)
+        ]
+
+        # Per-site neighbour table (L², 4) for Wolff cluster growth, built
+        # on the first wolff_step call (plain metropolis runs never need it):
+        self._site_neighbors = None
+
+    def load_spins(self, spins):
+        """
+        Replace the grid with a copy of spins and resync the running totals.
+
+        Used to warm-start a model from the final grid of a nearby
+        temperature instead of a random one.
+
+        Args:
+            spins (array-like): Grid(s) of ±1 values, shaped like self.spins.
+        """
+        self.spins[...] = spins
+        # Copy into the existing int8 buffer, keeping its dtype and layout.
+
+        self.energy = total_energy(self)
+        self.magnetization = magnetization(self)
+
+    def _spin_field(self, rows=slice(None)):
         """
-        Calculate ΔE if we flip the spin at position (i, j).
+        Calculate s·nb, each spin times the sum of its four neighbours.
 
         Uses periodic boundaries so edges wrap around like a torus.
+        Flipping (i, j) changes the energy by ΔE = 2·J·s·nb; the result
+        plus 4 (and the replica's row offset) indexes self._threshold.
 
         Args:
-            i (int): Row index of the spin.
-            j (int): Column index of the spin.
+            rows (slice): Band of rows to compute (default: the whole grid).
+                The rows just above and below the band are read as a halo.
 
         Returns:
-            float: ΔE = E_new − E_old for flipping that spin.
+            np.ndarray: int8 array shaped like spins[..., rows, :], values
+            in {-4, -2, 0, 2, 4}.
         """
-        spin = self.spins[i, j]
-        # Current spin value (+1 or -1).
+        band = self.spins[..., rows, :]
 
-        # Sum four neighbors (down, up, right, left), using modulo for wrap:
+        # Sum four neighbors (down, up, right, left) via the index tables;
+        # negative axes keep this working with a leading replica axis:
         neighbors = (
-            self.spins[(i + 1) % self.L, j] +
-            self.spins[(i - 1) % self.L, j] +
-            self.spins[i, (j + 1) % self.L] +
-            self.spins[i, (j - 1) % self.L]
+            self.spins.take(self.down[rows], axis=-2) +
+            self.spins.take(self.up[rows], axis=-2) +
+            band.take(self.down, axis=-1) +
+            band.take(self.up, axis=-1)
         )
+        return band * neighbors
+
+    def _next_random_words(self):
+        """
+        Return the next slab of uniform random uint32 words for one sweep.
+
+        Draws are generated many sweeps at a time, so the per-call overhead
+        of the random generator is paid once per batch rather than per sweep.
+
+        Returns:
+            np.ndarray: View into the random buffer, shaped like spins.
+        """
+        if self._rand_next == len(self._rand_buf):
+            # Raw 64-bit PCG64 outputs, each split into two uint32 words;
+            # skips the range-reduction work of rng.integers entirely.
+            # spins.size is even (L is even), so the halving is exact:
+            n_words = self._sweeps_per_batch * self.spins.size
+            self._rand_buf = (
+                self.rng.bit_generator.random_raw(n_words // 2)
+                .view(np.uint32)
+                .reshape((self._sweeps_per_batch,) + self.spins.shape)
+            )
+            self._rand_next = 0
 
-        # ΔE formula for Ising with coupling J = 1:
-        # ΔE = 2 * J * spin * sum_of_neighbor_spins
-        delta_E = 2 * spin * neighbors
-        return delta_E
+        rand = self._rand_buf[self._rand_next]
+        self._rand_next += 1
+        return rand
 
     def metropolis_step(self):
         """
-        Perform one full sweep (L² attempts) of the Metropolis algorithm:
+        Perform one full sweep (L² attempts per replica) of the Metropolis
+        algorithm.
+
+        The sweep is split into two half-sweeps, one per checkerboard colour.
+        Sites of one colour don't interact, so within a half-sweep every
+        site is tested at once:
+         1. Compute ΔE for flipping each spin.
+         2. If ΔE ≤ 0 → accept flip.
+         3. Else accept with probability exp(−ΔE / T).
+
+        Every accepted flip also updates self.energy (by ΔE) and
+        self.magnetization (by −2·spin).
+        """
+        # One random 32-bit word per site, pre-generated in batches:
+        rand_buf = self._next_random_words()
+
+        for color, rows in itertools.product(self._colors, self._bands):
+            # 1) Energy change for every site in this band of rows (the
+            #    other colour is fixed): ΔE = 2·J·s·nb, with s·nb indexing
+            #    this replica's table row.
+            field = self._spin_field(rows)
+
+            # 2–3) Decide which sites of this colour flip. The threshold
+            #    table already encodes both rules (always if ΔE ≤ 0, else
+            #    with probability exp(−ΔE / T)), so one compare suffices:
+            accept = color[rows] & (
+                rand_buf[..., rows, :]
+                <= self._threshold[field + self._table_offset]
+            )
+            # Reinterpret the booleans as 0/1 int8 (no copy) so the flip
+            # below is plain arithmetic instead of a masked scatter:
+            accept = accept.view(np.int8)
+
+            # flipped is s where the site flips and 0 elsewhere:
+            band = self.spins[..., rows, :]
+            flipped = band * accept
+
+            # Keep the running totals in sync with the grid. Same-colour
+            # sites aren't neighbours, so their ΔE values simply add up
+            # (summed per replica over the last two axes):
+            self.energy += 2 * self.J * (field * accept).sum(
+                axis=(-2, -1), dtype=np.int64
+            )
+            self.magnetization -= 2 * flipped.sum(
+                axis=(-2, -1), dtype=np.int64
+            )
+
+            band -= 2 * flipped
+            # s − 2s = −s flips +1 ↔ -1; unflipped sites subtract 0.
+            # band is a view, so this writes straight into self.spins.
+
+    def wolff_step(self):
+        """
+        Perform one Wolff single-cluster update (single grid only).
+
+        1. Pick a random seed spin s and flip it.
+        2. Grow the cluster one breadth-first layer at a time: each bond
+           from the newest layer to a neighbour still equal to s fires
+           with probability p_add = 1 − exp(−2J / T), and the neighbours
+           it reaches are flipped as they join. Flipping on joining also
+           marks them, since they no longer equal s.
+        3. Stop when a layer adds no sites; the cluster has then flipped.
+
+        Near Tc a single cluster can span much of the grid, so this
+        decorrelates configurations far faster than local flips, whose
+        autocorrelation time grows roughly like L^2.17 there.
+
+        self.energy is recomputed with total_energy over the whole grid
+        afterwards, so every step costs O(L²) even for a small cluster.
+        """
+        if np.ndim(self.T):
+            raise ValueError("wolff_step needs a single-temperature model")
+
+        L = self.L
+
+        if self._site_neighbors is None:
+            # Site (i, j) is numbered i·L + j; list its four neighbours:
+            sites = np.arange(L * L).reshape(L, L)
+            self._site_neighbors = np.stack([
+                sites.take(self.up, axis=0),
+                sites.take(self.down, axis=0),
+                sites.take(self.up, axis=1),
+                sites.take(self.down, axis=1),
+            ], axis=-1).reshape(L * L, 4)
+
+        p_add = 1.0 - np.exp(-2.0 * self.J / self.T)
+        flat = self.spins.ravel()
+        # A view: writes to flat go straight into self.spins.
+
+        # 1) Seed site, flipped as soon as it joins the cluster, so
+        #    "equals s" also means "not in the cluster yet":
+        seed = self.rng.integers(L * L)
+        s = flat[seed]
+        flat[seed] = -s
+        size = 1
+
+        # 2) Grow the cluster one BFS layer at a time. Every bond from the
+        #    newest layer to an aligned neighbour is tested once, with all
+        #    of the layer's uniforms drawn in a single call:
+        frontier = np.array([seed])
+        while frontier.size:
+            candidates = self._site_neighbors[frontier].ravel()
+            candidates = candidates[flat[candidates] == s]
+            candidates = candidates[self.rng.random(candidates.size) < p_add]
+
+            # A site reached over several bonds joins if any of them fires:
+            frontier = np.unique(candidates)
+            flat[frontier] = -s
+            size += frontier.size
+
+        # Keep the running totals in sync with the grid. Only bonds on the
+        # cluster boundary change, so recomputing the energy is simplest:
+        self.magnetization -= 2 * int(s) * size
+        self.energy = total_energy(self)
+
+    def swap_replicas(self, parity):
+        """
+        Propose parallel-tempering swaps between neighbouring replicas.
+
+        Pairs (0, 1), (2, 3), … when parity is 0, or (1, 2), (3, 4), … when
+        parity is 1. Each pair (i, j) exchanges its configurations with
+        probability min(1, exp((1/Tᵢ − 1/Tⱼ)·(Eᵢ − Eⱼ))), which keeps every
+        replica sampling its own temperature while letting configurations
+        random-walk in T and escape slow low-temperature states.
 
-        For each attempt:
-         1. Pick a random spin.
-         2. Compute ΔE if flipped.
-         3. If ΔE ≤ 0 → accept flip.
-         4. Else accept with probability exp(−ΔE / T).
+        Args:
+            parity (int): 0 or 1, which set of neighbouring pairs to try.
         """
-        for _ in range(self.L * self.L):
-            # 1) Choose a random site (i, j):
-            i = np.random.randint(0, self.L)
-            j = np.random.randint(0, self.L)
-
-            # 2) Compute the energy change for flipping it:
-            delta_E = self._energy_change(i, j)
-
-            # 3) Decide to flip:
-            #    - Always if ΔE ≤ 0 (energy-lowering).
-            #    - Otherwise with probability exp(−ΔE / T).
-            if delta_E <= 0 or np.random.rand() < np.exp(-delta_E / self.T):
-                self.spins[i, j] *= -1
-                # Multiply by -1 flips +1 ↔ -1.
+        beta = 1.0 / np.asarray(self.T, dtype=float)
+        i = np.arange(parity, len(beta) - 1, 2)
+        j = i + 1
+
+        # Metropolis test for each pair, all drawn at once:
+        log_p = (beta[i] - beta[j]) * (self.energy[i] - self.energy[j])
+        swap = self.rng.random(len(i)) < np.exp(np.minimum(log_p, 0.0))
+        i, j = i[swap], j[swap]
+
+        # Exchange grids and their running totals; temperatures stay put:
+        self.spins[np.r_[i, j]] = self.spins[np.r_[j, i]]
+        self.energy[np.r_[i, j]] = self.energy[np.r_[j, i]]
+        self.magnetization[np.r_[i, j]] = self.magnetization[np.r_[j, i]]
@@ -1,3 +1,6 @@
+import numpy as np
+# Import NumPy for whole-grid (vectorized) reductions.
+
 def total_energy(model):
     """
     Compute the total energy of the model’s current spin grid.
@@ -6,23 +9,22 @@ def total_energy(model):
         model: an IsingModel instance.
 
     Returns:
-        float: Sum of all pairwise interactions (each counted once).
+        float or np.ndarray: Sum of all pairwise interactions (each counted
+        once); one value per replica when the model holds several.
     """
-    E = 0.0
-    L = model.L
     spins = model.spins
 
-    # Loop over every cell in the L×L grid:
-    for i in range(L):
-        for j in range(L):
-            # Look only “right” and “down” to avoid double-counting each pair:
-            right = spins[i, (j + 1) % L]
-            down  = spins[(i + 1) % L, j]
-
-            # Interaction energy: -J * s(i,j) * s(neighbor) with J = 1
-            E -= spins[i, j] * (right + down)
+    # Gather every site's “right” and “down” neighbour using the model's
+    # precomputed wrap-around index tables (no modulo per access).
+    # Looking only right and down avoids double-counting each pair:
+    right = spins.take(model.down, axis=-1)
+    down  = spins.take(model.down, axis=-2)
 
-    return E
+    # Interaction energy: -J * Σ s(i,j) * (right + down).
+    # einsum multiplies and sums in one pass (no temporary product array);
+    # accumulate in int64 since int8 spins would overflow.
+    return -model.J * np.einsum('...ij,...ij->...', spins, right + down,
+                                dtype=np.int64)
 
 def magnetization(model):
     """
@@ -32,6 +34,8 @@ def magnetization(model):
         model: an IsingModel instance.
 
     Returns:
-        int: Positive if more +1 spins, negative if more -1 spins.
+        int or np.ndarray: Positive if more +1 spins, negative if more -1
+        spins; one value per replica when the model holds several.
     """
-    return model.spins.sum()
+    # Sum in int64: an int8 accumulator would overflow past 127 spins.
+    return model.spins.sum(axis=(-2, -1), dtype=np.int64)
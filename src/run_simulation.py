@@ -3,59 +3,261 @@
 print("run_simulation.py loaded")                      # ── ADDED: sanity check at import
 print("Module __name__ is:", __name__)                   # ── ADDED: confirm main guard will run
 
-from ising import IsingModel
-from observables import total_energy, magnetization
+from ising import IsingModel, T_CRITICAL
 import numpy as np
-import matplotlib.pyplot as plt
 import time                                        # ── ADDED: import time module for timing
 
-# Matplotlib for plotting; aliased as plt by convention.
-def simulate(L, temps, n_eq, n_samp):
+import itertools                                   # ── ADDED: alternate update algorithms
+import os                                          # ── ADDED: CPU count for the worker pool
+from multiprocessing import Pool                   # ── ADDED: run temperatures in parallel
+
+WOLFF_WINDOW = 0.2
+# For Tc ≤ T < Tc + WOLFF_WINDOW, _run_T alternates Metropolis sweeps with
+# Wolff cluster updates, which beats critical slowing down where local
+# flips stall. Below Tc the cluster is most of the grid and a Wolff step
+# mostly just reverses the sign of M, so Metropolis alone is cheaper there.
+
+def _run_T(model, n_eq, n_samp):
+    """
+    Equilibrate and sample an IsingModel at its temperature.
+
+    The sampling loop only stores each sweep's energy and magnetization;
+    all averaging happens afterwards in whole-array NumPy reductions.
+
+    Args:
+        model: an IsingModel instance (single grid), possibly warm-started.
+        n_eq (int): Number of sweeps to equilibrate (no data collection).
+        n_samp (int): Number of sweeps to sample/average after equilibration.
+
+    Returns:
+        (float, float, float, float, float): Sample means of E, E², |M|,
+            M² and M⁴ (whole-grid totals, not per spin) at model.T.
+    """
+    # Just above Tc, alternate Metropolis sweeps with Wolff cluster updates
+    # (each counts as one step of n_eq / n_samp):
+    T_c = T_CRITICAL * model.J
+    if T_c <= model.T < T_c + WOLFF_WINDOW:
+        steps = itertools.cycle((model.metropolis_step, model.wolff_step))
+        def sweep():
+            next(steps)()
+    else:
+        sweep = model.metropolis_step
+
+    # 1) Equilibration phase (no recording):
+    for _ in range(n_eq):
+        sweep()
+
+    # 2) Sampling phase (record energy & magnetization).
+    #    The model keeps both as running totals, so no grid re-scan;
+    #    float64 series so the higher powers below can't overflow:
+    E = np.empty(n_samp)
+    M = np.empty(n_samp)
+    for t in range(n_samp):
+        sweep()
+        E[t] = model.energy
+        M[t] = abs(model.magnetization)
+
+    # 3) Moments of the recorded series; M⁴ reuses M² (one multiply, no pow):
+    M2 = M * M
+    return E.mean(), (E * E).mean(), M.mean(), M2.mean(), (M2 * M2).mean()
+
+def _run_chain(L, temps, n_eq, n_samp, seed, n_eq_cold):
+    """
+    Simulate ascending temperatures in turn, each warm-started from the last.
+
+    The coldest temperature starts from the all-up grid (the ground state);
+    every later one starts from the previous temperature's final grid,
+    which is already close to equilibrium, so n_eq can be kept small.
+    The cold-started head gets the full n_eq_cold sweeps instead.
+
+    Module-level so worker processes can pickle it by reference.
+
+    Args:
+        L (int): Grid size (L×L).
+        temps (iterable): Temperatures to simulate, in ascending order.
+        n_eq (int): Number of sweeps to equilibrate each warm-started
+            temperature.
+        n_samp (int): Number of sweeps to sample/average after equilibration.
+        seed (SeedSequence): Seed for this chain; each temperature gets a
+            child of it so worker streams never overlap.
+        n_eq_cold (int): Number of sweeps to equilibrate the first
+            temperature, which starts from the all-up grid.
+
+    Returns:
+        list of tuple: _run_T's five moments for each temperature in temps.
+    """
+    results = []
+    prev_spins = np.ones((L, L), dtype=np.int8)  # cold start: all spins up
+    sweeps = n_eq_cold                           # ... so equilibrate fully
+
+    for T, child in zip(temps, seed.spawn(len(temps))):
+        model = IsingModel(L, T, seed=child)
+        model.load_spins(prev_spins)
+        results.append(_run_T(model, sweeps, n_samp))
+        prev_spins = model.spins
+        sweeps = n_eq                            # later temperatures are warm
+
+    return results
+
+def _thermodynamics(L, temps, E, E2, M, M2, M4):
+    """
+    Turn per-temperature sample moments into per-spin observables.
+
+    Every argument after L is an array over temperatures, so each quantity
+    is one vectorized NumPy expression for the whole scan.
+
+    Args:
+        L (int): Grid size (L×L).
+        temps (np.ndarray): Temperatures the moments were sampled at.
+        E, E2, M, M2, M4 (np.ndarray): Means of E, E², |M|, M² and M⁴
+            (whole-grid totals) at each temperature.
+
+    Returns:
+        (np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+            energies_per_spin, magnetizations_per_spin,
+            heat_capacities_per_spin, binder_cumulants
+    """
+    N = L * L
+    heat_capacity = (E2 - E * E) / (temps * temps * N)   # C = Var(E) / (T² N)
+    binder = 1.0 - M4 / (3.0 * M2 * M2)                   # U = 1 − ⟨M⁴⟩ / 3⟨M²⟩²
+    return E / N, M / N, heat_capacity, binder
+
+def simulate(L, temps, n_eq, n_samp, n_jobs=None, n_eq_cold=1000, seed=None):
     """
     Run simulations over a range of temperatures.
 
+    Temperatures are sorted and split into n_jobs contiguous chains that
+    run in a pool of worker processes. Within a chain each temperature is
+    warm-started from the previous one's final grid (see _run_chain).
+
     Args:
         L (int): Grid size (L×L).
         temps (iterable): Temperatures to test.
+        n_eq (int): Number of sweeps to equilibrate each warm-started
+            temperature (no data collection).
+        n_samp (int): Number of sweeps to sample/average after equilibration.
+        n_jobs (int or None): Worker processes; None uses every CPU core
+            (never more than len(temps)).
+        n_eq_cold (int): Number of sweeps to equilibrate the first
+            temperature of each chain, which is not warm-started.
+        seed (int, SeedSequence or None): Root seed for the run; None
+            draws fresh entropy from the OS. A fixed seed reproduces a run
+            only for the same n_jobs, since n_jobs decides how temperatures
+            are split into chains and how many chain seeds are spawned.
+
+    Returns:
+        (np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+            energies_per_spin, magnetizations_per_spin,
+            heat_capacities_per_spin, binder_cumulants
+            for each temperature in temps.
+    """
+    temps = np.asarray(temps, dtype=float)
+    if len(temps) == 0:
+        # Nothing to run: empty arrays, without starting a pool.
+        return _thermodynamics(L, temps, *np.empty((5, 0)))
+
+    # At least one worker, and never more workers than temperatures:
+    if n_jobs is None:
+        n_jobs = os.cpu_count() or 1
+    n_jobs = max(1, min(n_jobs, len(temps)))
+
+    # Ascending order so each chain heats up gradually:
+    order = np.argsort(temps)
+    chains = np.array_split(temps[order], n_jobs)
+
+    # One independent seed per chain, spawned from the root seed:
+    seeds = np.random.SeedSequence(seed).spawn(n_jobs)
+
+    with Pool(n_jobs) as pool:
+        jobs = [
+            pool.apply_async(
+                _run_chain, (L, chain, n_eq, n_samp, seed, n_eq_cold)
+            )
+            for chain, seed in zip(chains, seeds)
+        ]
+
+        results = []
+        for i, job in enumerate(jobs, start=1):
+            results.extend(job.get())
+            # ── ADDED: progress print for each finished chain
+            print(f"→ Finished chain {i}/{n_jobs}", end="\r", flush=True)
+
+    # Put the moments back in the caller's temperature order
+    moments = np.empty((len(temps), 5))
+    moments[order] = results
+
+    return _thermodynamics(L, temps, *moments.T)
+
+def simulate_replicas(L, temps, n_eq, n_samp, swap_interval=None, seed=None):
+    """
+    Run every temperature at once as a stack of replicas.
+
+    Same results as simulate(), but one IsingModel holds an L×L grid per
+    temperature and each metropolis_step sweeps all of them together, so
+    the Python loop runs n_eq + n_samp times in total instead of per T.
+
+    With swap_interval set this becomes parallel tempering: every
+    swap_interval sweeps, neighbouring temperatures propose to exchange
+    configurations (alternating even and odd pairs). That shortens
+    autocorrelation times near Tc, so fewer sweeps give the same error.
+
+    Args:
+        L (int): Grid size (L×L).
+        temps (iterable): Temperatures to test, in ascending or descending
+            order so that neighbours in the list are close in T.
         n_eq (int): Number of sweeps to equilibrate (no data collection).
         n_samp (int): Number of sweeps to sample/average after equilibration.
+        swap_interval (int or None): Sweeps between replica-swap attempts;
+            None runs the replicas independently.
+        seed (int, SeedSequence or None): Seed for the model's random
+            generator; None draws fresh entropy from the OS.
 
     Returns:
-        (np.ndarray, np.ndarray):
-            energies_per_spin, magnetizations_per_spin
+        (np.ndarray, np.ndarray, np.ndarray, np.ndarray):
+            energies_per_spin, magnetizations_per_spin,
+            heat_capacities_per_spin, binder_cumulants
             for each temperature in temps.
     """
-    energies = []  # List to store average energies per spin
-    mags     = []  # List to store average magnetizations per spin
+    temps = np.asarray(temps, dtype=float)
+    if len(temps) == 0:
+        # Nothing to run: empty arrays, matching simulate().
+        return _thermodynamics(L, temps, *np.empty((5, 0)))
 
-    for i, T in enumerate(temps, start=1):
-        # ── ADDED: progress print for each temperature
-        print(f"→ Running T = {T:.2f} ({i}/{len(temps)})", end="\r", flush=True)
+    # 1) One replica per temperature, all in the same model:
+    model = IsingModel(L, temps, seed=seed)
 
-        # 1) Initialize a fresh IsingModel at temp T:
-        model = IsingModel(L, T)
+    # 2) Equilibration (first n_eq sweeps), then sampling (last n_samp).
+    #    Energy and magnetization are per-replica arrays, always belonging
+    #    to the temperature slot, whichever grid currently sits there:
+    E = np.empty((n_samp, len(temps)))
+    M = np.empty((n_samp, len(temps)))
+    for step in range(1, n_eq + n_samp + 1):
+        model.metropolis_step()
 
-        # 2) Equilibration phase (no recording):
-        for _ in range(n_eq):
-            model.metropolis_step()
+        # Parallel tempering: every swap_interval sweeps, try neighbour
+        # swaps, alternating between even and odd pairs:
+        if swap_interval and step % swap_interval == 0:
+            model.swap_replicas((step // swap_interval) % 2)
 
         # 3) Sampling phase (record energy & magnetization):
-        E_accum = 0.0
-        M_accum = 0.0
-        for _ in range(n_samp):
-            model.metropolis_step()
-            E_accum += total_energy(model)
-            M_accum += abs(magnetization(model))
+        if step > n_eq:
+            E[step - n_eq - 1] = model.energy
+            M[step - n_eq - 1] = np.abs(model.magnetization)
 
-        # 4) Normalize to per‐spin averages:
-        norm = 1.0 / (n_samp * L * L)
-        energies.append(E_accum * norm)
-        mags.append(M_accum * norm)
-
-    # Convert lists to NumPy arrays for plotting
-    return np.array(energies), np.array(mags)
+    # 4) Moments per temperature (down each column), as in _run_T:
+    M2 = M * M
+    return _thermodynamics(
+        L, temps, E.mean(axis=0), (E * E).mean(axis=0),
+        M.mean(axis=0), M2.mean(axis=0), (M2 * M2).mean(axis=0)
+    )
 
 if __name__ == "__main__":
+    # Matplotlib for plotting; aliased as plt by convention.
+    # Imported only here: worker processes started with "spawn" (the
+    # default on Windows and macOS) re-import this module, and pyplot
+    # alone adds ~0.6 s of startup to each of them.
+    import matplotlib.pyplot as plt
+
     # ── ADDED: print at start of main
     print("▶ Starting simulation…")
 
@@ -68,13 +270,19 @@ if __name__ == "__main__":
     # ── ADDED: quick‐test override
     # temps = np.linspace(2.0, 2.5, 5)
 
-    n_eq   = 1000                        # Sweeps before sampling
+    n_eq   = 200                         # Sweeps before sampling (warm-started)
+    n_eq_cold = 1000                     # Sweeps before sampling (cold start)
     n_samp = 2000                        # Sweeps we sample
 
     # ── ADDED: start timing simulation
     t0 = time.time()
     # Run the simulation:
-    energies, mags = simulate(L, temps, n_eq, n_samp)
+    energies, mags, heat_caps, binder = simulate(L, temps, n_eq, n_samp, n_eq_cold=n_eq_cold)
+    # ── ADDED: or sweep all temperatures together as one replica stack
+    #    (every replica starts cold, so use the full equilibration)
+    # energies, mags, heat_caps, binder = simulate_replicas(L, temps, n_eq_cold, n_samp)
+    # ── ADDED: or with parallel tempering (replica swaps every 10 sweeps)
+    # energies, mags, heat_caps, binder = simulate_replicas(L, temps, n_eq_cold, n_samp, swap_interval=10)
     elapsed = time.time() - t0            # ── ADDED: compute elapsed time
 
     # ── ADDED: print simulation duration before plotting
@@ -94,8 +302,22 @@ if __name__ == "__main__":
     plt.ylabel('|Magnetization| per spin')
     plt.title('Ising Model: Magnetization vs T')
 
-    # Display both plots on screen:
+    # Plot Heat Capacity vs Temperature (peaks near Tc):
+    plt.figure()
+    plt.plot(temps, heat_caps, marker='o')
+    plt.xlabel('Temperature (T)')
+    plt.ylabel('Heat capacity per spin')
+    plt.title('Ising Model: Heat Capacity vs T')
+
+    # Plot Binder cumulant vs Temperature (2/3 when ordered, → 0 above Tc):
+    plt.figure()
+    plt.plot(temps, binder, marker='o')
+    plt.xlabel('Temperature (T)')
+    plt.ylabel('Binder cumulant U')
+    plt.title('Ising Model: Binder Cumulant vs T')
+
+    # Display all plots on screen:
     plt.show()
 
     # ── ADDED: final confirmation after plots are closed
-    print(" Done! Energy and Magnetization plots displayed.")
+    print(" Done! Energy, Magnetization, Heat Capacity and Binder plots displayed.")